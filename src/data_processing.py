@@ -12,23 +12,33 @@ import argparse
 
 DEFAULT_URL = "https://d2beiqkhq929f0.cloudfront.net/public_assets/assets/000/001/428/original/bike_sharing.csv?1642089089"
 DEFAULT_INPUT = Path("data/yulu_data.csv")
-DEFAULT_OUTPUT = Path("data/processed_yulu_data.csv")
+DEFAULT_OUTPUT = Path("data/processed_yulu_data.parquet")
 
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
-def load_data(path: str = None, url: str = None) -> pd.DataFrame:
+
+def _read_csv(source, use_pyarrow: bool = True) -> pd.DataFrame:
+    """Read a CSV path/URL, using the multithreaded PyArrow parser when enabled."""
+    if use_pyarrow:
+        # Arrow parses timestamps inline and keeps numeric columns in Arrow buffers
+        return pd.read_csv(source, engine="pyarrow", dtype_backend="pyarrow")
+    return pd.read_csv(source)
+
+
+def load_data(path: str = None, url: str = None, use_pyarrow: bool = True) -> pd.DataFrame:
     """Load CSV either from a local path or a URL."""
     if url:
-        df = pd.read_csv(url)
+        df = _read_csv(url, use_pyarrow)
         print(f"[load_data] Loaded data from URL: {url}")
     elif path:
-        df = pd.read_csv(path)
+        df = _read_csv(path, use_pyarrow)
         print(f"[load_data] Loaded data from file: {path}")
     else:
         if DEFAULT_INPUT.exists():
-            df = pd.read_csv(DEFAULT_INPUT)
+            df = _read_csv(DEFAULT_INPUT, use_pyarrow)
             print(f"[load_data] Loaded data from default path: {DEFAULT_INPUT}")
         else:
-            df = pd.read_csv(DEFAULT_URL)
+            df = _read_csv(DEFAULT_URL, use_pyarrow)
             print(f"[load_data] No local file - loaded data from default URL.")
     return df
 
@@ -39,84 +49,155 @@ def basic_clean(df: pd.DataFrame) -> pd.DataFrame:
     # parse datetime
     if "datetime" in df.columns:
         df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
-    # drop exact duplicates
-    df = df.drop_duplicates().reset_index(drop=True)
+    # drop duplicates - one record per hourly timestamp, so hash just that column when present.
+    # Unparseable (NaT) timestamps carry no identity, so those rows only drop as exact duplicates.
+    if "datetime" in df.columns:
+        nat = df["datetime"].isna()
+        dup = df.duplicated(subset=["datetime"]) & ~nat
+        if nat.any():
+            dup[nat] = df[nat].duplicated()
+        df = df[~dup]
+        df.index = pd.RangeIndex(len(df))
+    else:
+        df = df.drop_duplicates(ignore_index=True)
     return df
 
 
 def impute_and_cast(df: pd.DataFrame) -> pd.DataFrame:
     """Cast numeric columns and impute missing with medians (where sensible)."""
     numeric_cols = ["temp", "atemp", "humidity", "windspeed", "casual", "registered", "count"]
-    for c in numeric_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-            med = df[c].median()
-            if np.isnan(med):
-                med = 0
-            df[c] = df[c].fillna(med)
-
-    # cast season/weather/workingday to int if present
-    for c in ["season", "weather", "workingday", "holiday"]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
+    num_present = [c for c in numeric_cols if c in df.columns]
+    if num_present:
+        df[num_present] = df[num_present].apply(pd.to_numeric, errors="coerce")
+        # integer columns with gaps go to float first, or filling a fractional median would truncate it
+        has_na = df[num_present].isna().any()
+        na_cols = [c for c in num_present if has_na[c]]
+        if na_cols:
+            df[na_cols] = df[na_cols].astype(np.float64)
+        # one median pass over all columns; all-NaN columns fall back to 0
+        df[num_present] = df[num_present].fillna(df[num_present].median().fillna(0))
+
+    # cast season/weather/workingday to int if present (int8 is plenty for these codes)
+    int_present = [c for c in ["season", "weather", "workingday", "holiday"] if c in df.columns]
+    if int_present:
+        df[int_present] = df[int_present].apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.int8)
+
+    # If count missing, compute from registered+casual - before downcasting, so the sum can't wrap
+    if "count" not in df.columns and {"registered", "casual"}.issubset(df.columns):
+        df["count"] = df["registered"] + df["casual"]
+
+    # downcast measurements to float32 and hourly rental counts (< ~1000) to uint16
+    float_present = [c for c in ["temp", "atemp", "humidity", "windspeed"] if c in df.columns]
+    count_present = [c for c in ["casual", "registered", "count"] if c in df.columns]
+    if float_present:
+        df[float_present] = df[float_present].astype(np.float32)
+    if count_present:
+        # round imputed medians; columns outside the uint16 range keep their wider dtype
+        counts = df[count_present].round()
+        fits = counts.min().ge(0) & counts.max().le(np.iinfo(np.uint16).max)
+        down = [c for c in count_present if fits[c]]
+        if down:
+            df[down] = counts[down].astype(np.uint16)
     return df
 
 
+def _with_nat(values: np.ndarray, nat: np.ndarray):
+    """Return integer features as-is, or as a nullable array if some timestamps failed to parse."""
+    return pd.arrays.IntegerArray(values, nat) if nat.any() else values
+
+
+def _bucketize(x: np.ndarray, quantiles=None, labels=None, edges=None, bounds=None) -> pd.Categorical:
+    """Bin values into labelled buckets via searchsorted on quantile (or fixed) edges.
+
+    Bins are right-closed like pd.qcut/pd.cut, so a value equal to an edge falls in the lower bucket.
+    NaN, and values outside the (low, high] bounds of fixed-edge bins, come out missing as in pd.cut.
+    """
+    if edges is None:
+        edges = np.nanquantile(x, quantiles)
+    codes = np.searchsorted(np.asarray(edges, dtype=x.dtype), x, side="left").astype(np.int8)
+    invalid = np.isnan(x)
+    if bounds is not None:
+        invalid |= (x <= bounds[0]) | (x > bounds[1])
+    codes[invalid] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def _label_codes(codes: np.ndarray, labels: list) -> pd.Categorical:
+    """Map 1-based integer codes onto ordered labels by array indexing; out-of-range codes become "unknown".
+
+    The "unknown" category is only added when some code needs it, matching data_processing_polars.finalize.
+    """
+    valid = (codes >= 1) & (codes <= len(labels))
+    idx = np.where(valid, codes - 1, len(labels)).astype(np.int8)
+    categories = labels + ["unknown"] if not valid.all() else labels
+    return pd.Categorical.from_codes(idx, categories=categories, ordered=True)
+
+
 def feature_engineering(df: pd.DataFrame) -> pd.DataFrame:
     """Create time-based features and categories similar to notebook."""
     if "datetime" in df.columns:
-        df["hour"] = df["datetime"].dt.hour
-        df["day_of_week"] = df["datetime"].dt.day_name()
-        df["weekday"] = df["datetime"].dt.weekday  # Monday=0
-        df["month"] = df["datetime"].dt.month
-        df["year"] = df["datetime"].dt.year
-
-        # helpful date-only column for grouping in some notebook cells
-        df["date"] = df["datetime"].dt.date
+        # derive everything from integer hour/day/month views once instead of via several .dt accessors;
+        # the views work in whatever unit the column carries, so timestamps outside the ns range survive
+        ts = df["datetime"].to_numpy()
+        nat = np.isnat(ts)
+        hours = ts.astype("datetime64[h]").view("i8")  # hours since 1970-01-01
+        days = ts.astype("datetime64[D]").view("i8")
+        months = ts.astype("datetime64[M]").view("i8")  # months since 1970-01
+        weekday = ((days + 3) % 7).astype(np.int8)  # 1970-01-01 was a Thursday; Monday=0
+
+        df["hour"] = _with_nat((hours % 24).astype(np.int8), nat)
+        df["day_of_week"] = pd.Categorical.from_codes(np.where(nat, -1, weekday), categories=DAY_NAMES, ordered=True)
+        df["weekday"] = _with_nat(weekday, nat)
+        df["month"] = _with_nat((months % 12 + 1).astype(np.int8), nat)
+        df["year"] = _with_nat((months // 12 + 1970).astype(np.int16), nat)
+
+        # helpful date-only column for grouping in some notebook cells (datetime64[D], not Python dates)
+        df["date"] = ts.astype("datetime64[D]")
 
     # season_label mapping seen in notebook
     if "season" in df.columns:
-        season_map = {1: "spring", 2: "summer", 3: "fall", 4: "winter"}
-        df["season_label"] = df["season"].map(season_map).fillna("unknown")
+        season_labels = ["spring", "summer", "fall", "winter"]
+        df["season_label"] = _label_codes(df["season"].to_numpy(np.int8), season_labels)
 
     # weather label mapping (common mapping)
     if "weather" in df.columns:
-        weather_map = {1: "clear", 2: "mist/cloudy", 3: "light_precip", 4: "heavy_precip"}
-        df["weather_label"] = df["weather"].map(weather_map).fillna("unknown")
-
-    # If count missing, compute from registered+casual if available
-    if "count" not in df.columns and {"registered", "casual"}.issubset(df.columns):
-        df["count"] = df["registered"] + df["casual"]
+        weather_labels = ["clear", "mist/cloudy", "light_precip", "heavy_precip"]
+        df["weather_label"] = _label_codes(df["weather"].to_numpy(np.int8), weather_labels)
 
   
     # Temperature categories: use quantiles for ~even bins (adjust as needed)
     if "temp" in df.columns and "temp_category" not in df.columns:
-        df["temp_category"] = pd.qcut(df["temp"], q=4, labels=["cold", "mild", "warm", "hot"])
+        temp = df["temp"].to_numpy(dtype=np.float32, copy=False)
+        df["temp_category"] = _bucketize(temp, [0.25, 0.5, 0.75], ["cold", "mild", "warm", "hot"])
 
     if "atemp" in df.columns and "atemp_category" not in df.columns:
-        df["atemp_category"] = pd.qcut(df["atemp"], q=4, labels=["cold", "mild", "warm", "hot"])
+        atemp = df["atemp"].to_numpy(dtype=np.float32, copy=False)
+        df["atemp_category"] = _bucketize(atemp, [0.25, 0.5, 0.75], ["cold", "mild", "warm", "hot"])
 
     if "humidity" in df.columns and "humidity_category" not in df.columns:
-        df["humidity_category"] = pd.cut(df["humidity"], bins=[-1, 30, 60, 100], labels=["low", "medium", "high"])
+        humidity = df["humidity"].to_numpy(dtype=np.float32, copy=False)
+        df["humidity_category"] = _bucketize(humidity, labels=["low", "medium", "high"], edges=[30, 60], bounds=(-1, 100))
 
     if "windspeed" in df.columns and "windspeed_category" not in df.columns:
         # small nonzero floor to avoid identical values causing single bin
-        df["windspeed"] = df["windspeed"].replace(0, df["windspeed"].median())
-        df["windspeed_category"] = pd.qcut(df["windspeed"], q=3, labels=["low", "medium", "high"])
+        windspeed = df["windspeed"].to_numpy(dtype=np.float32, copy=True)
+        windspeed[windspeed == 0] = np.nanmedian(windspeed)
+        df["windspeed"] = windspeed
+        df["windspeed_category"] = _bucketize(windspeed, [1 / 3, 2 / 3], ["low", "medium", "high"])
 
     return df
 
 
 def process(input_path: str = None, url: str = None, output_path: str = None) -> pd.DataFrame:
-    """Run the full pipeline and save processed CSV."""
-    output_path = Path(output_path) if output_path else DEFAULT_OUTPUT
+    """Run the full pipeline and save processed Parquet (typed, so plots.py needn't re-parse)."""
+    output_path = Path(output_path).with_suffix(".parquet") if output_path else DEFAULT_OUTPUT
     df = load_data(path=input_path, url=url)
     df = basic_clean(df)
     df = impute_and_cast(df)
     df = feature_engineering(df)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, index=False)
-    print(f"[process] Wrote processed CSV: {output_path}")
+    df.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False, use_dictionary=True)
+    print(f"[process] Wrote processed Parquet: {output_path}")
     print("[process] Columns:", list(df.columns))
     return df
 
@@ -125,6 +206,6 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process Yulu / Bike-sharing dataset")
     parser.add_argument("--input", "-i", help="Local CSV path (e.g. data/yulu_data.csv)")
     parser.add_argument("--url", "-u", help="CSV download URL")
-    parser.add_argument("--output", "-o", default=str(DEFAULT_OUTPUT), help="Output processed CSV path")
+    parser.add_argument("--output", "-o", default=str(DEFAULT_OUTPUT), help="Output processed Parquet path")
     args = parser.parse_args()
     process(input_path=args.input, url=args.url, output_path=args.output)
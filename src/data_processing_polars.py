@@ -0,0 +1,179 @@
+"""
+src/data_processing_polars.py
+
+Polars (lazy) version of the pipeline in data_processing.py. The whole
+load -> clean -> impute -> feature-engineering chain is built as one lazy
+query and collected once, so the CSV is parsed in a single pass with no
+intermediate frames. Dtypes that depend on the data (uint16 counts, whether
+the labels need an "unknown" category) are then settled on the collected
+frame before it is written to Parquet.
+
+Usage:
+    python src/data_processing_polars.py --input data/yulu_data.csv
+"""
+
+from pathlib import Path
+import polars as pl
+import argparse
+
+from data_processing import DEFAULT_URL, DEFAULT_INPUT, DEFAULT_OUTPUT, DAY_NAMES
+
+FLOAT_COLS = ["temp", "atemp", "humidity", "windspeed"]
+COUNT_COLS = ["casual", "registered", "count"]
+NUMERIC_COLS = FLOAT_COLS + COUNT_COLS
+INT_COLS = ["season", "weather", "workingday", "holiday"]
+SEASON_MAP = {1: "spring", 2: "summer", 3: "fall", 4: "winter"}
+WEATHER_MAP = {1: "clear", 2: "mist/cloudy", 3: "light_precip", 4: "heavy_precip"}
+UINT16_MAX = 65535
+
+
+def scan_data(path: str = None, url: str = None) -> pl.LazyFrame:
+    """Lazily scan CSV from a local path, or read it from a URL."""
+    if url:
+        print(f"[scan_data] Reading data from URL: {url}")
+        return pl.read_csv(url, try_parse_dates=True).lazy()
+    if path:
+        print(f"[scan_data] Scanning data from file: {path}")
+        return pl.scan_csv(path, try_parse_dates=True)
+    if DEFAULT_INPUT.exists():
+        print(f"[scan_data] Scanning data from default path: {DEFAULT_INPUT}")
+        return pl.scan_csv(DEFAULT_INPUT, try_parse_dates=True)
+    print(f"[scan_data] No local file - reading data from default URL.")
+    return pl.read_csv(DEFAULT_URL, try_parse_dates=True).lazy()
+
+
+def _quantiles(col: str, quantiles: list) -> list:
+    """Quantile edges as lazy expressions, interpolated linearly like np.quantile/pd.qcut."""
+    return [pl.col(col).quantile(q, interpolation="linear") for q in quantiles]
+
+
+def _bucket(col: str, edges: list, labels: list, bounds=None) -> pl.Expr:
+    """Right-closed bins like pd.qcut/pd.cut as an Enum in label order.
+
+    Null/NaN values, and values outside the (low, high] bounds of fixed-edge bins, stay null.
+    """
+    x = pl.col(col).cast(pl.Float64)
+    missing = x.is_null() | x.is_nan()
+    if bounds is not None:
+        missing = missing | (x <= bounds[0]) | (x > bounds[1])
+    expr = pl.when(missing).then(None)
+    for edge, label in zip(edges, labels):
+        expr = expr.when(x <= edge).then(pl.lit(label))
+    return expr.otherwise(pl.lit(labels[-1])).cast(pl.Enum(labels))
+
+
+def _label_enum(col: str, mapping: dict) -> pl.Expr:
+    """Map integer codes onto an Enum of labels; unmapped codes become "unknown"."""
+    labels = list(mapping.values()) + ["unknown"]
+    return pl.col(col).replace_strict(mapping, default="unknown", return_dtype=pl.Enum(labels))
+
+
+def finalize(df: pl.DataFrame) -> pl.DataFrame:
+    """Settle data-dependent dtypes the way data_processing does.
+
+    Counts become uint16 where the rounded values fit, and labels drop "unknown" when no row uses it.
+    """
+    counts = [c for c in COUNT_COLS if c in df.columns]
+    fits = [c for c in counts if df[c].round().min() >= 0 and df[c].round().max() <= UINT16_MAX] if df.height else counts
+    casts = [pl.col(c).round().cast(pl.UInt16) for c in fits]
+    for col, mapping in (("season_label", SEASON_MAP), ("weather_label", WEATHER_MAP)):
+        if col in df.columns and not (df[col] == "unknown").any():
+            casts.append(pl.col(col).cast(pl.String).cast(pl.Enum(list(mapping.values()))))
+    return df.with_columns(casts)
+
+
+def build_pipeline(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Clean, impute and feature-engineer - mirrors data_processing.process (counts are downcast in finalize)."""
+    # lowercase columns, parse datetime
+    lf = lf.rename(lambda c: c.strip().lower())
+    schema = lf.collect_schema()
+    cols = schema.names()
+    if "datetime" in cols and schema["datetime"] == pl.String:
+        lf = lf.with_columns(pl.col("datetime").str.to_datetime(strict=False))
+
+    # drop duplicates - one record per hourly timestamp when present; rows whose timestamp
+    # failed to parse (null) only drop as exact duplicates, as in data_processing.basic_clean
+    if "datetime" in cols:
+        lf = lf.filter(
+            pl.when(pl.col("datetime").is_null())
+            .then(pl.struct(pl.all()).is_first_distinct())
+            .otherwise(pl.col("datetime").is_first_distinct())
+        )
+    else:
+        lf = lf.unique(keep="first", maintain_order=True)
+
+    # numeric casts + median imputation (all-null columns fall back to 0)
+    num_present = [c for c in NUMERIC_COLS if c in cols]
+    lf = lf.with_columns(
+        [pl.col(c).cast(pl.Float64, strict=False) if schema[c] == pl.String else pl.col(c) for c in num_present]
+    ).with_columns([pl.col(c).fill_null(pl.col(c).median()).fill_null(0) for c in num_present])
+
+    int_present = [c for c in INT_COLS if c in cols]
+    lf = lf.with_columns([pl.col(c).cast(pl.Int8, strict=False).fill_null(0) for c in int_present])
+
+    # derive count before downcasting, so registered + casual can't wrap in uint16
+    if "count" not in cols and {"registered", "casual"}.issubset(cols):
+        lf = lf.with_columns((pl.col("registered") + pl.col("casual")).alias("count"))
+        cols = cols + ["count"]
+
+    # same downcast as data_processing.impute_and_cast for measurements; counts wait for finalize
+    lf = lf.with_columns([pl.col(c).cast(pl.Float32) for c in FLOAT_COLS if c in cols])
+
+    features = []
+    if "datetime" in cols:
+        dt = pl.col("datetime").dt
+        features += [
+            dt.hour().cast(pl.Int8).alias("hour"),
+            dt.strftime("%A").cast(pl.Enum(DAY_NAMES)).alias("day_of_week"),
+            (dt.weekday() - 1).cast(pl.Int8).alias("weekday"),  # Monday=0, same as pandas
+            dt.month().cast(pl.Int8).alias("month"),
+            dt.year().cast(pl.Int16).alias("year"),
+            # midnight Datetime rather than Date, which pandas would read back as Python date objects
+            dt.truncate("1d").cast(pl.Datetime("ms")).alias("date"),
+        ]
+    if "season" in cols:
+        features.append(_label_enum("season", SEASON_MAP).alias("season_label"))
+    if "weather" in cols:
+        features.append(_label_enum("weather", WEATHER_MAP).alias("weather_label"))
+    if "datetime" in cols:
+        features.append(pl.col("datetime").cast(pl.Datetime("ms")))  # same unit pandas writes
+    lf = lf.with_columns(features)
+
+    # windspeed: replace zeros with the median before bucketing, as the pandas version does
+    if "windspeed" in cols:
+        lf = lf.with_columns(
+            pl.when(pl.col("windspeed") == 0)
+            .then(pl.col("windspeed").median())
+            .otherwise(pl.col("windspeed"))
+            .alias("windspeed")
+        )
+
+    categories = []
+    if "temp" in cols:
+        categories.append(_bucket("temp", _quantiles("temp", [0.25, 0.5, 0.75]), ["cold", "mild", "warm", "hot"]).alias("temp_category"))
+    if "atemp" in cols:
+        categories.append(_bucket("atemp", _quantiles("atemp", [0.25, 0.5, 0.75]), ["cold", "mild", "warm", "hot"]).alias("atemp_category"))
+    if "humidity" in cols:
+        categories.append(_bucket("humidity", [30, 60], ["low", "medium", "high"], bounds=(-1, 100)).alias("humidity_category"))
+    if "windspeed" in cols:
+        categories.append(_bucket("windspeed", _quantiles("windspeed", [1 / 3, 2 / 3]), ["low", "medium", "high"]).alias("windspeed_category"))
+    return lf.with_columns(categories)
+
+
+def process(input_path: str = None, url: str = None, output_path: str = None) -> None:
+    """Run the full lazy pipeline in one pass and write the result to Parquet."""
+    output_path = Path(output_path).with_suffix(".parquet") if output_path else DEFAULT_OUTPUT
+    df = finalize(build_pipeline(scan_data(path=input_path, url=url)).collect())
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    df.write_parquet(output_path, compression="zstd")
+    print(f"[process] Wrote processed Parquet: {output_path}")
+    print("[process] Columns:", df.columns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process Yulu / Bike-sharing dataset (Polars lazy pipeline)")
+    parser.add_argument("--input", "-i", help="Local CSV path (e.g. data/yulu_data.csv)")
+    parser.add_argument("--url", "-u", help="CSV download URL")
+    parser.add_argument("--output", "-o", default=str(DEFAULT_OUTPUT), help="Output processed Parquet path")
+    args = parser.parse_args()
+    process(input_path=args.input, url=args.url, output_path=args.output)
@@ -2,20 +2,27 @@
 src/plots.py
 
 Usage:
-    # generate all plots using the processed CSV created by data_processing.py
-    python src/plots.py --input data/processed_yulu_data.csv
+    # generate all plots using the processed Parquet created by data_processing.py
+    python src/plots.py --input data/processed_yulu_data.parquet
 """
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import numpy as np
 import argparse
 
 sns.set(style="whitegrid")
 FIG_DIR = Path("figures")
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
+# plots only need this many points to look the same; beyond it everything overplots
+MAX_TREND_POINTS = 5000
+MAX_BOX_POINTS_PER_GROUP = 5000
+
 
 def _save(fig, name):
     path = FIG_DIR / name
@@ -29,6 +36,14 @@ def plot_seasonal_trends(df, season_col="season_label", count_col="count"):
     if season_col not in df.columns:
         print(f"[plot_seasonal_trends] Missing column: {season_col} - skipping")
         return
+    sizes = df[season_col].value_counts()
+    if sizes.max() > MAX_BOX_POINTS_PER_GROUP:
+        # quartiles are stable well below this many points per season; sample only oversized seasons
+        big = df[season_col].isin(sizes.index[sizes > MAX_BOX_POINTS_PER_GROUP])
+        capped = df[big].groupby(season_col, observed=True, group_keys=False).sample(
+            n=MAX_BOX_POINTS_PER_GROUP, random_state=0
+        )
+        df = pd.concat([df[~big], capped])
     fig, ax = plt.subplots(figsize=(8, 5))
     sns.boxplot(x=season_col, y=count_col, data=df, ax=ax)
     ax.set_title("Rental Distribution Across Seasons")
@@ -38,34 +53,37 @@ def plot_seasonal_trends(df, season_col="season_label", count_col="count"):
 
 
 def plot_temp_vs_count(df, temp_col="temp", count_col="count"):
-    """Scatter + smooth line for temperature vs rentals."""
+    """Hexbin density + smooth line for temperature vs rentals."""
     if temp_col not in df.columns:
         print(f"[plot_temp_vs_count] Missing column: {temp_col} - skipping")
         return
+    sample = df.sample(MAX_TREND_POINTS, random_state=0) if len(df) > MAX_TREND_POINTS else df
     fig, ax = plt.subplots(figsize=(8, 5))
-    sns.scatterplot(x=temp_col, y=count_col, data=df, alpha=0.4, ax=ax)
+    # 2D histogram over all rows - O(N), no per-point artists
+    hb = ax.hexbin(df[temp_col].to_numpy(), df[count_col].to_numpy(), gridsize=40, mincnt=1, cmap="Blues")
+    fig.colorbar(hb, ax=ax, label="hourly records")
     try:
-        sns.regplot(x=temp_col, y=count_col, data=df, scatter=False, lowess=True, ax=ax, ci=None)
+        # LOWESS is O(N^2): fit on the sample, with a smaller window and a single robustness pass
+        from statsmodels.nonparametric.smoothers_lowess import lowess
+
+        trend = lowess(sample[count_col].to_numpy(), sample[temp_col].to_numpy(), frac=0.3, it=1)
+        ax.plot(trend[:, 0], trend[:, 1], color="C3")
     except Exception:
         # fallback: linear regression line
-        sns.regplot(x=temp_col, y=count_col, data=df, scatter=False, ax=ax, ci=None)
+        sns.regplot(x=temp_col, y=count_col, data=sample, scatter=False, ax=ax, ci=None)
     ax.set_title("Temperature vs Rentals")
     ax.set_xlabel("Temperature (C)")
     ax.set_ylabel("Count")
     _save(fig, "temp_vs_count.png")
 
 
-def plot_hourly_pattern(df, hour_col="hour", count_col="count"):
-    """Average rentals by hour of day."""
-    if hour_col not in df.columns:
-        if "datetime" in df.columns:
-            df[hour_col] = pd.to_datetime(df["datetime"]).dt.hour
-        else:
-            print(f"[plot_hourly_pattern] No '{hour_col}' or 'datetime' column - skipping")
-            return
-    hourly = df.groupby(hour_col)[count_col].mean().reset_index()
+def plot_hourly_pattern(hourly, hour_col="hour", count_col="count"):
+    """Average rentals by hour of day, from the precomputed hourly means."""
+    if hourly is None:
+        print(f"[plot_hourly_pattern] No '{hour_col}' or 'datetime' column - skipping")
+        return
     fig, ax = plt.subplots(figsize=(10, 5))
-    sns.lineplot(x=hour_col, y=count_col, data=hourly, marker="o", ax=ax)
+    sns.lineplot(x=hour_col, y=count_col, data=hourly.reset_index(), marker="o", ax=ax)
     ax.set_xticks(range(0, 24))
     ax.set_title("Average Rentals by Hour")
     ax.set_xlabel("Hour of day")
@@ -79,72 +97,180 @@ def plot_category_counts(df, cat_col="temp_category"):
         print(f"[plot_category_counts] Missing column: {cat_col} - skipping")
         return
     fig, ax = plt.subplots(figsize=(8, 5))
-    order = df[cat_col].value_counts().index
+    dtype = df[cat_col].dtype
+    if isinstance(dtype, pd.CategoricalDtype) and dtype.ordered:
+        # label order is fixed when the column is built - no need to count first.
+        # Unordered categoricals may carry first-appearance order, so those are still counted.
+        order = dtype.categories
+    else:
+        order = df[cat_col].value_counts().index
     sns.countplot(x=cat_col, data=df, order=order, ax=ax)
     ax.set_title(f"Distribution of {cat_col}")
     _save(fig, f"{cat_col}_distribution.png")
 
 
-def plot_registered_vs_casual(df, reg_col="registered", casual_col="casual"):
+def plot_registered_vs_casual(totals, daily=None, reg_col="registered", casual_col="casual"):
     """Pie chart of total registered vs casual share, and timeseries per date if available."""
-    if reg_col in df.columns and casual_col in df.columns:
-        total_reg = df[reg_col].sum()
-        total_cas = df[casual_col].sum()
-        fig, ax = plt.subplots(figsize=(6, 6))
-        ax.pie([total_reg, total_cas], labels=["registered", "casual"], autopct="%1.1f%%", startangle=90)
-        ax.set_title("Registered vs Casual Share (total)")
-        _save(fig, "registered_vs_casual.png")
-
-        if "date" in df.columns:
-            ts = df.groupby("date")[[reg_col, casual_col]].sum().reset_index()
-            fig2, ax2 = plt.subplots(figsize=(12, 5))
-            sns.lineplot(x="date", y=reg_col, data=ts, label="registered", ax=ax2)
-            sns.lineplot(x="date", y=casual_col, data=ts, label="casual", ax=ax2)
-            ax2.set_title("Registered vs Casual over time (by date)")
-            ax2.set_xlabel("Date")
-            ax2.set_ylabel("Total rides")
-            ax2.legend()
-            _save(fig2, "registered_vs_casual_timeseries.png")
-    else:
+    if totals is None:
         print("[plot_registered_vs_casual] Missing registered/casual columns - skipping")
+        return
+    fig, ax = plt.subplots(figsize=(6, 6))
+    ax.pie([totals[reg_col], totals[casual_col]], labels=["registered", "casual"], autopct="%1.1f%%", startangle=90)
+    ax.set_title("Registered vs Casual Share (total)")
+    _save(fig, "registered_vs_casual.png")
 
+    if daily is not None:
+        ts = daily.reset_index()
+        fig2, ax2 = plt.subplots(figsize=(12, 5))
+        sns.lineplot(x="date", y=reg_col, data=ts, label="registered", ax=ax2)
+        sns.lineplot(x="date", y=casual_col, data=ts, label="casual", ax=ax2)
+        ax2.set_title("Registered vs Casual over time (by date)")
+        ax2.set_xlabel("Date")
+        ax2.set_ylabel("Total rides")
+        ax2.legend()
+        _save(fig2, "registered_vs_casual_timeseries.png")
 
-def plot_correlation_heatmap(df):
-    """Heatmap for numeric correlations."""
-    num = df.select_dtypes(include="number")
-    if num.shape[1] < 2:
+
+def plot_correlation_heatmap(corr):
+    """Heatmap for the precomputed numeric correlation matrix."""
+    if corr is None:
         print("[plot_correlation_heatmap] Not enough numeric columns - skipping")
         return
-    corr = num.corr()
     fig, ax = plt.subplots(figsize=(9, 7))
     sns.heatmap(corr, annot=True, fmt=".2f", cmap="vlag", center=0, ax=ax)
     ax.set_title("Correlation heatmap (numeric features)")
     _save(fig, "correlation_heatmap.png")
 
 
-def generate_all(input_csv="data/processed_yulu_data.csv"):
-    """Load processed CSV and call all plot functions."""
-    p = Path(input_csv)
+def _hourly_mean(hours, counts, hour_col="hour", count_col="count"):
+    """Mean count per hour (0-23) via np.bincount instead of a hash-based groupby."""
+    valid = (hours >= 0) & (hours < 24)
+    hours = hours[valid].astype(np.intp)
+    out_sum = np.bincount(hours, weights=counts[valid], minlength=24)
+    out_cnt = np.bincount(hours, minlength=24)
+    seen = out_cnt > 0
+    return pd.Series(out_sum[seen] / out_cnt[seen], index=pd.Index(np.flatnonzero(seen), name=hour_col), name=count_col)
+
+
+def _daily_sums(df, days, cols):
+    """Per-day sums keyed on int64 days-since-epoch, so groupby hits its int64 fast path."""
+    valid = ~np.isnat(days)
+    keys = days[valid].view("i8")
+    daily = df.loc[valid, cols].groupby(keys).sum()
+    daily.index = pd.Index(daily.index.to_numpy().view("datetime64[D]"), name="date")
+    return daily
+
+
+def _corr(num):
+    """Pearson correlation as one float32 matmul on standardized columns (pairwise-NaN fallback)."""
+    X = num.to_numpy(dtype=np.float32, na_value=np.nan)
+    if np.isnan(X).any():
+        return num.corr()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        X = (X - X.mean(0)) / X.std(0)
+        corr = (X.T @ X) / X.shape[0]
+    return pd.DataFrame(corr, index=num.columns, columns=num.columns)
+
+
+def compute_aggregates(df, hour_col="hour", count_col="count", reg_col="registered", casual_col="casual"):
+    """Compute every aggregate the plots need up front, so no plot function re-scans df."""
+    agg = {"hourly": None, "totals": None, "daily": None, "corr": None}
+
+    if hour_col not in df.columns and "datetime" in df.columns:
+        # datetime is usually already typed (Parquet, or parsed inline by the Arrow CSV reader);
+        # only legacy CSVs with non-ISO timestamps still need parsing here
+        dt = df["datetime"]
+        if not pd.api.types.is_datetime64_any_dtype(dt):
+            dt = pd.to_datetime(dt)
+        df[hour_col] = dt.dt.hour
+    if hour_col in df.columns:
+        hours = df[hour_col].to_numpy()
+        if hours.dtype.kind in "iu":
+            agg["hourly"] = _hourly_mean(hours, df[count_col].to_numpy(dtype=np.float64), hour_col, count_col)
+        else:
+            # missing hours (float/nullable column) - fall back to pandas groupby
+            agg["hourly"] = df.groupby(hour_col, observed=True)[count_col].mean()
+
+    if reg_col in df.columns and casual_col in df.columns:
+        agg["totals"] = df[[reg_col, casual_col]].sum()
+        if "datetime" in df.columns and pd.api.types.is_datetime64_any_dtype(df["datetime"]):
+            agg["daily"] = _daily_sums(df, df["datetime"].to_numpy(dtype="datetime64[D]"), [reg_col, casual_col])
+        elif "date" in df.columns:
+            agg["daily"] = df.groupby("date", observed=True)[[reg_col, casual_col]].sum()
+
+    num = df.select_dtypes(include="number")
+    if num.shape[1] >= 2:
+        agg["corr"] = _corr(num)
+    return agg
+
+
+def _columns(df, *cols):
+    """Subset of df with just the columns a plot reads, so workers aren't shipped the whole frame."""
+    return df[[c for c in cols if c in df.columns]]
+
+
+def _positive_int(value):
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return n
+
+
+def _render_one(spec):
+    """Worker entry point: build and save one figure from (plot function, args, kwargs)."""
+    func, args, kwargs = spec
+    func(*args, **kwargs)
+
+
+def generate_all(input_path="data/processed_yulu_data.parquet", workers=None):
+    """Load processed Parquet (or a legacy processed CSV) and render all plots in parallel.
+
+    Each worker process gets only the columns or precomputed aggregates it needs and saves its
+    own figure, so no Figure objects cross process boundaries. workers=1 renders inline.
+    """
+    p = Path(input_path)
     if not p.exists():
-        raise FileNotFoundError(f"Processed CSV not found: {input_csv}. Run src/data_processing.py first.")
-    df = pd.read_csv(p, parse_dates=["datetime"])
-    # ensure date column if used in notebook
-    if "date" not in df.columns and "datetime" in df.columns:
-        df["date"] = pd.to_datetime(df["datetime"]).dt.date
-
-    plot_seasonal_trends(df)
-    plot_temp_vs_count(df)
-    plot_hourly_pattern(df)
+        raise FileNotFoundError(f"Processed data not found: {input_path}. Run src/data_processing.py first.")
+    # Keep numpy dtypes (no dtype_backend="pyarrow") since seaborn/matplotlib expect them.
+    if p.suffix == ".csv":
+        # multithreaded Arrow parser; timestamps are parsed inline so no parse_dates needed
+        df = pd.read_csv(p, engine="pyarrow")
+    else:
+        # typed columnar read - categoricals and datetimes survive the round-trip
+        df = pd.read_parquet(p, engine="pyarrow")
+    # no datetime re-parsing here: process() already emits hour/date, and the daily
+    # aggregate keys off the typed datetime column directly
+
+    agg = compute_aggregates(df)
+
+    specs = [
+        (plot_seasonal_trends, (_columns(df, "season_label", "count"),), {}),
+        (plot_temp_vs_count, (_columns(df, "temp", "count"),), {}),
+        (plot_hourly_pattern, (agg["hourly"],), {}),
+    ]
     # category plots (temp/atemp/humidity/windspeed) if available
     for cat in ["temp_category", "atemp_category", "humidity_category", "windspeed_category"]:
         if cat in df.columns:
-            plot_category_counts(df, cat_col=cat)
-    plot_registered_vs_casual(df)
-    plot_correlation_heatmap(df)
+            specs.append((plot_category_counts, (df[[cat]],), {"cat_col": cat}))
+    specs.append((plot_registered_vs_casual, (agg["totals"], agg["daily"]), {}))
+    specs.append((plot_correlation_heatmap, (agg["corr"],), {}))
+
+    if workers is None:
+        workers = min(len(specs), os.cpu_count() or 1)
+    elif workers < 1:
+        raise ValueError(f"workers must be a positive integer, got {workers}")
+    if workers == 1:
+        for spec in specs:
+            _render_one(spec)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        # list() so exceptions raised in workers surface here
+        list(ex.map(_render_one, specs))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate plots for YULU case study")
-    parser.add_argument("--input", "-i", default="data/processed_yulu_data.csv", help="Processed CSV path")
+    parser.add_argument("--input", "-i", default="data/processed_yulu_data.parquet", help="Processed Parquet (or CSV) path")
+    parser.add_argument("--workers", "-w", type=_positive_int, help="Plot worker processes (default: one per plot, up to CPU count)")
     args = parser.parse_args()
-    generate_all(input_csv=args.input)
+    generate_all(input_path=args.input, workers=args.workers)